@@ -3,14 +3,16 @@
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
 import asyncio
-import os
 import shutil
 from datetime import datetime
+from typing import Optional
 
+from aiofiles import os as aios
+from aiofiles.os import path as aiopath
 from pytdbot import Client, types
 
 from src import config
-from src.helpers import call, db, start_clients
+from src.helpers import call, db, http_client, start_clients
 from src.modules.jobs import InactiveCallManager
 
 __version__ = "1.2.0.dev0"
@@ -36,6 +38,7 @@ class Telegram(Client):
         self.db = db
 
     async def start(self) -> None:
+        await self._reset_tdlib_db()
         await self.db.ping()
         await start_clients()
         await call.add_bot(self)
@@ -53,23 +56,39 @@ class Telegram(Client):
         self.logger.info(f"Version: {__version__}")
 
     async def stop(self) -> None:
-        shutdown_tasks = [
-            self.db.close(),
-            self.call_manager.stop_scheduler(),
-            super().stop(),
-        ]
-        await asyncio.gather(*shutdown_tasks)
+        shutdown_tasks = {
+            "db": asyncio.create_task(self.db.close()),
+            "http": asyncio.create_task(http_client.close()),
+            "scheduler": asyncio.create_task(self.call_manager.stop_scheduler()),
+            "client": asyncio.create_task(super().stop()),
+        }
+        results = await asyncio.gather(*shutdown_tasks.values(), return_exceptions=True)
+        for name, result in zip(shutdown_tasks, results):
+            if isinstance(result, Exception):
+                self.logger.error("Shutdown of %s failed: %s", name, result)
 
     @staticmethod
     def _check_config() -> None:
         if not config.API_ID or not config.API_HASH or not config.TOKEN:
             raise ValueError("API_ID, API_HASH and TOKEN are required")
-        if config.IGNORE_BACKGROUND_UPDATES and os.path.exists("database"):
-            shutil.rmtree("database")
         if not isinstance(config.MONGO_URI, str):
             raise TypeError("MONGO_URI must be a string")
         if not config.SESSION_STRINGS:
             raise ValueError("No STRING session provided\n\nAdd STRING session in .env")
 
+    @staticmethod
+    async def _reset_tdlib_db() -> None:
+        if config.IGNORE_BACKGROUND_UPDATES and await aiopath.exists("database"):
+            await asyncio.to_thread(shutil.rmtree, "database")
+        await aios.makedirs("database/photos", exist_ok=True)
+        await aios.makedirs(config.DOWNLOADS_DIR, exist_ok=True)
+
+
+_instance: Optional[Telegram] = None
+
 
-client: Telegram = Telegram()
+def get_client() -> Telegram:
+    global _instance
+    if _instance is None:
+        _instance = Telegram()
+    return _instance
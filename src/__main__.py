@@ -2,21 +2,15 @@
 #  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
-from aiofiles import os
+from src import get_client
+from src.config import COOKIES_URL
 
-from src import client
-from src.config import COOKIES_URL, DOWNLOADS_DIR
 
-
-async def create_directories() -> None:
+async def load_resources() -> None:
     """
-    Create directories and save cookies.
-
-    This function will create the following directories:
-      - `config.DOWNLOADS_DIR`
-      - `database/photos`
+    Load translations and save cookies.
 
-    It will also call `src.platforms._save_cookies.save_all_cookies` to
+    This function will call `src.platforms._save_cookies.save_all_cookies` to
     download and save cookies from the URLs in `config.COOKIES_URL`.
 
     If any error occurs, it will raise a `SystemExit` exception with code 1.
@@ -25,15 +19,14 @@ async def create_directories() -> None:
 
     try:
         load_translations()
-        await os.makedirs(DOWNLOADS_DIR, exist_ok=True)
-        await os.makedirs("database/photos", exist_ok=True)
         await save_all_cookies(COOKIES_URL)
     except Exception as e:
         raise SystemExit(1) from e
 
 
 def main() -> None:
-    client.loop.create_task(create_directories())
+    client = get_client()
+    client.loop.create_task(load_resources())
     client.run()
 
 
@@ -7,6 +7,7 @@ from ._cacher import chat_cache
 from ._database import db
 from ._dataclass import CachedTrack, MusicTrack, PlatformTracks, TrackInfo, ChannelPlay
 from ._downloader import MusicServiceWrapper
+from ._httpx import http_client
 from ._jiosaavn import JiosaavnData
 from ._lang import load_translations, get_string, LangsButtons
 from ._pytgcalls import call, start_clients
@@ -20,6 +21,7 @@ __all__ = [
     "JiosaavnData",
     "db",
     "MusicServiceWrapper",
+    "http_client",
     "save_all_cookies",
     "CachedTrack",
     "TrackInfo",
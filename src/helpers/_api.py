@@ -2,37 +2,106 @@
 #  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
+import asyncio
 import re
+import time
 from pathlib import Path
-from typing import Optional, Union
+from typing import Awaitable, Callable, Optional, TypeVar, Union
+
+from aiofiles.os import path as aiopath
+from cachetools import TTLCache
 
 from src import config
 from src.logger import LOGGER
-from ._dataclass import MusicTrack, PlatformTracks, TrackInfo
+from ._dataclass import PlatformTracks, TrackInfo
 from ._dl_helper import SpotifyDownload
 from ._downloader import MusicService
-from ._httpx import HttpxClient
+from ._httpx import http_client
+
+T = TypeVar("T")
+
+# Successful lookups keyed by (method, sanitized query)
+_RESPONSE_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=300)
+# Successful get_track lookups keyed by ("get_track", track id)
+_TRACK_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=600)
+# In-flight lookups and downloads shared by concurrent callers
+_PENDING: dict[tuple[str, str], asyncio.Task] = {}
+
+NEW_API_URL = "https://spotify-dl-ss6q.onrender.com"
+# Circuit breaker for NEW_API_URL; skipped until fail_until after repeated failures
+_NEW_API_STATE = {"fail_until": 0.0, "consecutive_failures": 0}
+_NEW_API_FAILURE_THRESHOLD = 3
+_NEW_API_BASE_COOLDOWN = 30.0
+_NEW_API_MAX_COOLDOWN = 600.0
+
+
+async def _single_flight(key: tuple[str, str], fetch: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run fetch once for all concurrent callers sharing the same key.
+
+    Args:
+        key: Identifies the in-flight operation
+        fetch: Coroutine factory performing the actual work
+
+    Returns:
+        The result of the shared fetch
+    """
+    task = _PENDING.get(key)
+    if task is None:
+        task = asyncio.create_task(fetch())
+        _PENDING[key] = task
+        task.add_done_callback(lambda _: _PENDING.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _cached_call(
+    cache: TTLCache, key: tuple[str, str], fetch: Callable[[], Awaitable[Optional[T]]]
+) -> Optional[T]:
+    """
+    Return a cached result for key, or fetch it once for all concurrent callers.
+
+    Args:
+        cache: Cache that stores non-None results
+        key: Cache key
+        fetch: Coroutine factory performing the actual lookup
+
+    Returns:
+        The cached or freshly fetched result
+    """
+    if (cached := cache.get(key)) is not None:
+        return cached
+
+    result = await _single_flight(key, fetch)
+    if result is not None:
+        cache[key] = result
+    return result
 
 
 class ApiData(MusicService):
     """Handles music data from various streaming platforms through API integration."""
 
-    # URL patterns for supported music services
+    # URL patterns for supported music services, matched against sanitized queries
     URL_PATTERNS = {
         "apple_music": re.compile(
-            r"^(https?://)?(music\.apple\.com/([a-z]{2}/)?(album|playlist|song)/[a-zA-Z0-9\-_]+/[0-9]+)(\?.*)?$",
-            re.IGNORECASE,
+            r"^(https?://)?(music\.apple\.com/([a-z]{2}/)?(album|playlist|song)/[a-zA-Z0-9\-_]+/[0-9]+)$",
+            re.IGNORECASE | re.ASCII,
         ),
         "spotify": re.compile(
-            r"^(https?://)?(open\.spotify\.com/(track|playlist|album|artist)/[a-zA-Z0-9]+)(\?.*)?$",
-            re.IGNORECASE,
+            r"^(https?://)?(open\.spotify\.com/(track|playlist|album|artist)/[a-zA-Z0-9]+)$",
+            re.IGNORECASE | re.ASCII,
         ),
         "soundcloud": re.compile(
-            r"^(https?://)?(soundcloud\.com/[a-zA-Z0-9\-_]+/[a-zA-Z0-9\-_]+)(\?.*)?$",
-            re.IGNORECASE,
+            r"^(https?://)?(soundcloud\.com/[a-zA-Z0-9\-_]+/[a-zA-Z0-9\-_]+)$",
+            re.IGNORECASE | re.ASCII,
         ),
     }
 
+    # Single alternation over URL_PATTERNS so validation is one match call
+    _COMBINED_URL_RE = re.compile(
+        "|".join(f"(?:{p.pattern})" for p in URL_PATTERNS.values()),
+        re.IGNORECASE | re.ASCII,
+    )
+
     def __init__(self, query: Optional[str] = None) -> None:
         """
         Initialize ApiData with an optional query.
@@ -41,7 +110,7 @@ class ApiData(MusicService):
             query: URL or search query to process
         """
         self.query = self._sanitize_query(query) if query else None
-        self.client = HttpxClient()
+        self.client = http_client
         self.api_url = config.API_URL.rstrip("/") if config.API_URL else None
         self.api_key = config.API_KEY
 
@@ -63,7 +132,7 @@ class ApiData(MusicService):
         if not url or not self.api_url or not self.api_key:
             return False
 
-        return any(pattern.match(url) for pattern in self.URL_PATTERNS.values())
+        return bool(self._COMBINED_URL_RE.match(self._sanitize_query(url)))
 
     async def _make_api_request(
         self, endpoint: str, params: Optional[dict] = None
@@ -85,6 +154,47 @@ class ApiData(MusicService):
         url = f"{self.api_url}/{endpoint.lstrip('/')}"
         return await self.client.make_request(url, params=params)
 
+    async def _make_new_api_request(
+        self, endpoint: str, params: Optional[dict] = None
+    ) -> Optional[dict]:
+        """
+        Call the new Spotify API unless its circuit breaker is open.
+
+        Args:
+            endpoint: API endpoint to call
+            params: Optional query parameters
+
+        Returns:
+            dict: API response or None if failed or skipped
+        """
+        now = time.monotonic()
+        if now < _NEW_API_STATE["fail_until"]:
+            return None
+
+        try:
+            data = await self.client.make_request(
+                f"{NEW_API_URL}/{endpoint.lstrip('/')}", params=params
+            )
+        except Exception as e:
+            LOGGER.warning("New API request to %s failed: %s", endpoint, e)
+            data = None
+
+        if data is not None:
+            _NEW_API_STATE["consecutive_failures"] = 0
+            _NEW_API_STATE["fail_until"] = 0.0
+            return data
+
+        failures = _NEW_API_STATE["consecutive_failures"] + 1
+        _NEW_API_STATE["consecutive_failures"] = failures
+        if failures >= _NEW_API_FAILURE_THRESHOLD:
+            cooldown = min(
+                _NEW_API_BASE_COOLDOWN * 2 ** (failures - _NEW_API_FAILURE_THRESHOLD),
+                _NEW_API_MAX_COOLDOWN,
+            )
+            _NEW_API_STATE["fail_until"] = now + cooldown
+            LOGGER.warning("New API unavailable, using fallback for %.0fs", cooldown)
+        return None
+
     async def get_recommendations(self, limit: int = 4) -> Optional[PlatformTracks]:
         """
         Get recommended tracks.
@@ -108,14 +218,15 @@ class ApiData(MusicService):
         if not self.query or not self.is_valid(self.query):
             return None
 
+        return await _cached_call(
+            _RESPONSE_CACHE, ("get_info", self.query), self._fetch_info
+        )
+
+    async def _fetch_info(self) -> Optional[PlatformTracks]:
         # Use new /search/?q= endpoint instead of /get_url
-        new_url = f"https://spotify-dl-ss6q.onrender.com/search/?q={self.query}"
-        try:
-            data = await self.client.make_request(new_url)
-            if data and "results" in data:
-                return self._parse_tracks_response(data)
-        except Exception as e:
-            LOGGER.warning(f"New get_info endpoint failed: {e}")
+        data = await self._make_new_api_request("search/", {"q": self.query})
+        if data and "results" in data:
+            return self._parse_tracks_response(data)
 
         # Fallback to old endpoint
         data = await self._make_api_request("get_url", {"url": self.query})
@@ -135,15 +246,15 @@ class ApiData(MusicService):
         if self.is_valid(self.query):
             return await self.get_info()
 
+        return await _cached_call(
+            _RESPONSE_CACHE, ("search", self.query), self._fetch_search
+        )
+
+    async def _fetch_search(self) -> Optional[PlatformTracks]:
         # Try new Spotify search API first
-        try:
-            new_search_url = f"https://spotify-dl-ss6q.onrender.com/search"
-            params = {"q": self.query}
-            response = await self.client.make_request(new_search_url, params=params)
-            if response and "results" in response and response["results"]:
-                return self._parse_tracks_response(response)
-        except Exception as e:
-            LOGGER.warning(f"New Spotify search API failed: {e}")
+        response = await self._make_new_api_request("search", {"q": self.query})
+        if response and "results" in response and response["results"]:
+            return self._parse_tracks_response(response)
 
         # Fallback to old API
         data = await self._make_api_request("search_track", {"q": self.query})
@@ -159,6 +270,11 @@ class ApiData(MusicService):
         if not self.query:
             return None
 
+        return await _cached_call(
+            _TRACK_CACHE, ("get_track", self.query), self._fetch_track
+        )
+
+    async def _fetch_track(self) -> Optional[TrackInfo]:
         data = await self._make_api_request("get_track", {"id": self.query})
         return TrackInfo(**data) if data else None
 
@@ -178,20 +294,33 @@ class ApiData(MusicService):
         if not track:
             return None
 
+        return await _single_flight(
+            ("download", track.tc), lambda: self._download_track(track)
+        )
+
+    async def _download_track(
+        self, track: TrackInfo
+    ) -> Optional[Union[str, Path, list[Path]]]:
+        # Only reached through _single_flight, so a file still being written
+        # by a concurrent download of this track is never returned here
+        cached_file = Path(config.DOWNLOADS_DIR) / f"{track.tc}.mp3"
+        if await aiopath.isfile(cached_file):
+            return cached_file
+
         try:
             if track.platform.lower() == "spotify":
                 # Determine if it's a track or playlist
                 is_playlist = "playlist" in track.url.lower()
                 if is_playlist:
                     # Use full URL for playlists
-                    spotify_api_url = f"https://spotify-dl-ss6q.onrender.com/download/?url={track.url}"
+                    spotify_api_url = f"{NEW_API_URL}/download/?url={track.url}"
                 else:
                     # Construct track URL from track ID
                     track_id = track.id or track.tc
                     if not track_id:
                         raise Exception("No track ID available")
                     spotify_track_url = f"https://open.spotify.com/track/{track_id}"
-                    spotify_api_url = f"https://spotify-dl-ss6q.onrender.com/download/?url={spotify_track_url}"
+                    spotify_api_url = f"{NEW_API_URL}/download/?url={spotify_track_url}"
 
                 result = await self.client.download_file(spotify_api_url)
                 if result.success:
@@ -227,9 +356,13 @@ class ApiData(MusicService):
                 str(e),
                 exc_info=True,
             )
-            # Fallback to original Spotify logic
+            # Fallback to original Spotify logic, file-based if streaming fails
             if track.platform.lower() == "spotify":
-                return await SpotifyDownload(track).process_original()
+                downloader = SpotifyDownload(track)
+                return (
+                    await downloader.process_streaming()
+                    or await downloader.process_original()
+                )
 
             LOGGER.error(
                 "Error downloading track %s: %s",
@@ -254,8 +387,11 @@ class ApiData(MusicService):
             return None
 
         valid_tracks = [
-            MusicTrack(**track)
-            for track in data["results"]
-            if track and isinstance(track, dict)
+            track for track in data["results"] or () if track and isinstance(track, dict)
         ]
-        return PlatformTracks(tracks=valid_tracks) if valid_tracks else None
+        # Validate the whole list in one pydantic call instead of per-track models
+        return (
+            PlatformTracks.model_validate({"tracks": valid_tracks})
+            if valid_tracks
+            else None
+        )
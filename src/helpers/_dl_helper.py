@@ -3,94 +3,107 @@
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
 import asyncio
+import contextlib
 import os
+import shutil
 import subprocess
-from typing import Optional, List
+from typing import Optional, List, Union
 from pathlib import Path
 import zipfile
 
-import aiofiles
-from Crypto.Cipher import AES
-from Crypto.Util import Counter
+from aiofiles.os import path as aiopath
+from cryptography.hazmat.primitives.ciphers import Cipher, CipherContext, algorithms, modes
 
 from src import config
-from src.helpers._httpx import HttpxClient
+from src.helpers._httpx import http_client
 from src.logger import LOGGER
 from ._dataclass import TrackInfo
 
 
-async def rebuild_ogg(filename: str) -> None:
+_OGG_S = b"OggS"
+_OGG_ZEROES = b"\x00" * 10
+# (offset, bytes) fields overwritten in a broken OGG header; bytes in between are kept
+_OGG_HEADER_PATCHES = (
+    (0, _OGG_S),
+    (6, _OGG_ZEROES),
+    (26, b"\x01\x1e\x01vorbis"),  # vorbis start
+    (39, b"\x02"),  # channels
+    (40, b"\x44\xac\x00\x00"),  # sample rate
+    (48, b"\x00\xe2\x04\x00"),  # bit rate
+    (56, b"\xb8\x01"),  # packet sizes
+    (58, _OGG_S),
+    (62, _OGG_ZEROES),
+)
+_OGG_HEADER_SIZE = 72
+_AUDIO_IV = bytes.fromhex("72e067fbddcbcf77ebe8bc643f630d93")
+_STREAM_CHUNK_SIZE = 1 << 16
+
+
+def _patch_ogg_header(header: bytearray) -> None:
+    """Apply _OGG_HEADER_PATCHES in place to the first _OGG_HEADER_SIZE bytes."""
+    if len(header) < _OGG_HEADER_SIZE:
+        header.extend(b"\x00" * (_OGG_HEADER_SIZE - len(header)))
+    for offset, data in _OGG_HEADER_PATCHES:
+        header[offset : offset + len(data)] = data
+
+
+def _rebuild_ogg_sync(filename: Union[str, Path]) -> None:
+    with open(filename, "r+b") as ogg_file:
+        # Patch the header in memory and write it back in one go
+        header = bytearray(ogg_file.read(_OGG_HEADER_SIZE))
+        _patch_ogg_header(header)
+        ogg_file.seek(0)
+        ogg_file.write(header)
+
+
+async def rebuild_ogg(filename: Union[str, Path]) -> None:
     """
     Fixes broken OGG headers.
     """
-    if not os.path.exists(filename):
+    if not await aiopath.exists(filename):
         LOGGER.error("❌ Error: %s not found.", filename)
         return
 
     try:
-        async with aiofiles.open(filename, "r+b") as ogg_file:
-            ogg_s = b"OggS"
-            zeroes = b"\x00" * 10
-            vorbis_start = b"\x01\x1e\x01vorbis"
-            channels = b"\x02"
-            sample_rate = b"\x44\xac\x00\x00"
-            bit_rate = b"\x00\xe2\x04\x00"
-            packet_sizes = b"\xb8\x01"
-
-            await ogg_file.seek(0)
-            await ogg_file.write(ogg_s)
-            await ogg_file.seek(6)
-            await ogg_file.write(zeroes)
-            await ogg_file.seek(26)
-            await ogg_file.write(vorbis_start)
-            await ogg_file.seek(39)
-            await ogg_file.write(channels)
-            await ogg_file.seek(40)
-            await ogg_file.write(sample_rate)
-            await ogg_file.seek(48)
-            await ogg_file.write(bit_rate)
-            await ogg_file.seek(56)
-            await ogg_file.write(packet_sizes)
-            await ogg_file.seek(58)
-            await ogg_file.write(ogg_s)
-            await ogg_file.seek(62)
-            await ogg_file.write(zeroes)
+        await asyncio.to_thread(_rebuild_ogg_sync, filename)
     except Exception as e:
         LOGGER.error("Error rebuilding OGG file %s: %s", filename, e)
 
 
 class SpotifyDownload:
+    __slots__ = ("track", "client", "encrypted_file", "decrypted_file", "output_file")
+
     def __init__(self, track: TrackInfo):
         self.track = track
-        self.client = HttpxClient()
-        self.encrypted_file = os.path.join(
-            config.DOWNLOADS_DIR, f"{track.tc}.encrypted.ogg"
-        )
-        self.decrypted_file = os.path.join(
-            config.DOWNLOADS_DIR, f"{track.tc}.decrypted.ogg"
-        )
-        self.output_file = os.path.join(config.DOWNLOADS_DIR, f"{track.tc}.ogg")
+        self.client = http_client
+        downloads = Path(config.DOWNLOADS_DIR)
+        self.encrypted_file: Path = downloads / f"{track.tc}.encrypted.ogg"
+        self.decrypted_file: Path = downloads / f"{track.tc}.decrypted.ogg"
+        self.output_file: Path = downloads / f"{track.tc}.ogg"
+
+    def _new_decryptor(self) -> CipherContext:
+        key = bytes.fromhex(self.track.key)
+        return Cipher(algorithms.AES(key), modes.CTR(_AUDIO_IV)).decryptor()
+
+    def _decrypt_sync(self) -> None:
+        decryptor = self._new_decryptor()
+
+        buf = bytearray(1 << 20)  # 1MB reusable buffer
+        view = memoryview(buf)
+        with (
+            open(self.encrypted_file, "rb", buffering=0) as fin,
+            open(self.decrypted_file, "wb") as fout,
+        ):
+            while n := fin.readinto(buf):
+                fout.write(decryptor.update(view[:n]))
+            fout.write(decryptor.finalize())
 
     async def decrypt_audio(self) -> None:
         """
-        Decrypt the downloaded audio file using a stream-based approach.
+        Decrypt the downloaded audio file in a worker thread.
         """
         try:
-            key = bytes.fromhex(self.track.key)
-            iv = bytes.fromhex("72e067fbddcbcf77ebe8bc643f630d93")
-            iv_int = int.from_bytes(iv, "big")
-            cipher = AES.new(
-                key, AES.MODE_CTR, counter=Counter.new(128, initial_value=iv_int)
-            )
-
-            chunk_size = 8192  # 8KB chunks
-            async with (
-                aiofiles.open(self.encrypted_file, "rb") as fin,
-                aiofiles.open(self.decrypted_file, "wb") as fout,
-            ):
-                while chunk := await fin.read(chunk_size):
-                    decrypted_chunk = cipher.decrypt(chunk)
-                    await fout.write(decrypted_chunk)
+            await asyncio.to_thread(self._decrypt_sync)
         except Exception as e:
             LOGGER.error("Error decrypting audio file: %s", e)
             raise
@@ -102,15 +115,22 @@ class SpotifyDownload:
         try:
             process = await asyncio.create_subprocess_exec(
                 "ffmpeg",
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-y",
                 "-i",
                 self.decrypted_file,
                 "-c",
                 "copy",
                 self.output_file,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
             )
-            _, stderr = await process.communicate()
+            # Only errors are logged, so this is empty on success; draining it
+            # before waiting keeps a chatty failure from filling the pipe.
+            stderr = await process.stderr.read()
+            await process.wait()
             if process.returncode != 0:
                 LOGGER.error("FFmpeg error: %s", stderr.decode().strip())
                 raise subprocess.CalledProcessError(process.returncode, "ffmpeg")
@@ -122,12 +142,27 @@ class SpotifyDownload:
         """
         Cleanup temporary files asynchronously.
         """
-        for file in [self.encrypted_file, self.decrypted_file]:
-            try:
-                if os.path.exists(file):
-                    os.remove(file)
-            except Exception as e:
-                LOGGER.warning("Error removing %s: %s", file, e)
+        files = (self.encrypted_file, self.decrypted_file)
+        results = await asyncio.gather(
+            *(asyncio.to_thread(file.unlink, missing_ok=True) for file in files),
+            return_exceptions=True,
+        )
+        for file, result in zip(files, results):
+            if isinstance(result, Exception):
+                LOGGER.warning("Error removing %s: %s", file, result)
+
+    @staticmethod
+    def _extract_zip_sync(zip_path: Path) -> list[Path]:
+        extracted_files = []
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            for info in zip_ref.infolist():
+                if info.is_dir() or not info.filename.endswith(".mp3"):
+                    continue
+                target = Path(config.DOWNLOADS_DIR) / Path(info.filename).name
+                with zip_ref.open(info) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1 << 20)
+                extracted_files.append(target)
+        return extracted_files
 
     async def _extract_zip(self, zip_path: Path) -> list[Path]:
         """
@@ -139,28 +174,27 @@ class SpotifyDownload:
         Returns:
             list[Path]: List of paths to extracted MP3 files
         """
-        extracted_files = []
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                for file_name in zip_ref.namelist():
-                    if file_name.endswith('.mp3'):
-                        zip_ref.extract(file_name, path=config.DOWNLOADS_DIR)
-                        extracted_files.append(Path(config.DOWNLOADS_DIR) / file_name)
-            os.remove(zip_path)  # Clean up ZIP
+            extracted_files = await asyncio.to_thread(self._extract_zip_sync, zip_path)
             LOGGER.info("Extracted %d MP3 files from %s", len(extracted_files), zip_path)
             return extracted_files
         except Exception as e:
             LOGGER.error("Error extracting ZIP %s: %s", zip_path, str(e))
             return []
+        finally:
+            try:
+                os.unlink(zip_path)  # Clean up ZIP
+            except OSError as e:
+                LOGGER.warning("Error removing %s: %s", zip_path, e)
 
-    async def process_original(self) -> Optional[str]:
+    async def process_original(self) -> Optional[Path]:
         """
-        Original Spotify download logic (preserved as fallback).
+        Original file-based Spotify download logic, used when streaming fails.
 
         Returns:
-            Optional[str]: Path to the downloaded file or None if failed
+            Optional[Path]: Path to the downloaded file or None if failed
         """
-        if os.path.exists(self.output_file):
+        if await aiopath.isfile(self.output_file):
             LOGGER.info("✅ Found existing file: %s", self.output_file)
             return self.output_file
 
@@ -181,3 +215,105 @@ class SpotifyDownload:
             LOGGER.error("Error processing track %s: %s", _track_id, e)
             await self._cleanup()
             return None
+
+    async def _pipe_decrypted(self, stdin: asyncio.StreamWriter) -> None:
+        """
+        Download, decrypt and header-patch the track into FFmpeg's stdin.
+        """
+        decryptor = self._new_decryptor()
+        header = bytearray()
+        header_done = False
+
+        # aclosing releases the pooled connection as soon as the loop is left early
+        async with contextlib.aclosing(
+            self.client.iter_bytes(self.track.cdnurl, chunk_size=_STREAM_CHUNK_SIZE)
+        ) as chunks:
+            async for chunk in chunks:
+                data = decryptor.update(chunk)
+                if not header_done:
+                    header += data
+                    if len(header) < _OGG_HEADER_SIZE:
+                        continue
+                    _patch_ogg_header(header)
+                    data, header_done = header, True
+                stdin.write(data)
+                await stdin.drain()
+
+        data = decryptor.finalize()
+        if not header_done:
+            header += data
+            _patch_ogg_header(header)
+            data = header
+        stdin.write(data)
+        await stdin.drain()
+        stdin.close()
+
+    async def process_streaming(self) -> Optional[Path]:
+        """
+        Download, decrypt and remux a track in a single pass.
+
+        The encrypted CDN stream is decrypted on the fly and piped into FFmpeg,
+        so only the final output file touches the disk.
+
+        Returns:
+            Optional[Path]: Path to the downloaded file or None if failed
+        """
+        if await aiopath.isfile(self.output_file):
+            LOGGER.info("✅ Found existing file: %s", self.output_file)
+            return self.output_file
+
+        _track_id = self.track.tc
+        if not self.track.cdnurl or not self.track.key:
+            LOGGER.warning("Missing CDN URL or key for track: %s", _track_id)
+            return None
+
+        process: Optional[asyncio.subprocess.Process] = None
+        stderr_task: Optional[asyncio.Task] = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-loglevel",
+                "error",
+                "-y",
+                "-i",
+                "pipe:0",
+                "-c",
+                "copy",
+                self.output_file,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+            # FFmpeg is fed while running, so stderr has to be drained concurrently
+            stderr_task = asyncio.create_task(process.stderr.read())
+            await self._pipe_decrypted(process.stdin)
+            stderr = await stderr_task
+            await process.wait()
+            if process.returncode != 0:
+                LOGGER.error("FFmpeg error: %s", stderr.decode().strip())
+                raise subprocess.CalledProcessError(process.returncode, "ffmpeg")
+            LOGGER.info("✅ Successfully processed track: %s", self.output_file)
+            return self.output_file
+        except ConnectionError as e:
+            # FFmpeg exited and closed its stdin early; stderr has the actual reason
+            stderr = b""
+            if stderr_task is not None:
+                with contextlib.suppress(Exception):
+                    stderr = await asyncio.wait_for(stderr_task, timeout=5)
+            LOGGER.error(
+                "FFmpeg error while streaming track %s: %s",
+                _track_id,
+                stderr.decode().strip() or e,
+            )
+            return None
+        except Exception as e:
+            LOGGER.error("Error streaming track %s: %s", _track_id, e)
+            return None
+        finally:
+            if stderr_task is not None:
+                stderr_task.cancel()
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
+            if process is not None and process.returncode != 0:
+                await asyncio.to_thread(self.output_file.unlink, missing_ok=True)
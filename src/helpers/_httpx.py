@@ -7,7 +7,7 @@ import re
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, AsyncIterator, Optional, Union
 from urllib.parse import unquote
 
 import aiofiles
@@ -31,12 +31,17 @@ class HttpxClient:
     CHUNK_SIZE = 8192  # 8KB chunks for streaming downloads
     MAX_RETRIES = 2
     BACKOFF_FACTOR = 1.0
+    MAX_CONNECTIONS = 100
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    KEEPALIVE_EXPIRY = 30.0
 
     def __init__(
         self,
         timeout: int = DEFAULT_TIMEOUT,
         download_timeout: int = DEFAULT_DOWNLOAD_TIMEOUT,
         max_redirects: int = 0,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
     ) -> None:
         """
         Initialize the HTTP client with configurable settings.
@@ -45,6 +50,8 @@ class HttpxClient:
             timeout: Timeout for general HTTP requests in seconds
             download_timeout: Timeout for file downloads in seconds
             max_redirects: Maximum number of redirects to follow (0 to disable)
+            max_keepalive_connections: Maximum number of idle pooled connections
+            keepalive_expiry: Seconds an idle pooled connection is kept open
         """
         self._timeout = timeout
         self._download_timeout = download_timeout
@@ -53,6 +60,11 @@ class HttpxClient:
             timeout=timeout,
             follow_redirects=max_redirects > 0,
             max_redirects=max_redirects,
+            limits=httpx.Limits(
+                max_connections=self.MAX_CONNECTIONS,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
         )
 
     async def close(self) -> None:
@@ -125,6 +137,35 @@ class HttpxClient:
             LOGGER.error(error_msg)
             return DownloadResult(success=False, error=error_msg)
 
+    async def iter_bytes(
+        self, url: str, chunk_size: int = CHUNK_SIZE, **kwargs: Any
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the body of a GET request chunk by chunk.
+
+        Args:
+            url: URL to stream
+            chunk_size: Size of the yielded chunks in bytes
+            **kwargs: Additional keyword arguments to pass to the underlying
+                `httpx` client.
+
+        Yields:
+            bytes: Successive chunks of the response body
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status
+        """
+        headers = kwargs.pop("headers", {})
+        if config.API_URL and url.startswith(config.API_URL):
+            headers["X-API-Key"] = API_KEY
+
+        async with self._session.stream(
+            "GET", url, timeout=self._download_timeout, headers=headers, **kwargs
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+
     @staticmethod
     def _handle_http_error(e: Exception, url: str) -> str:
         if isinstance(e, httpx.TooManyRedirects):
@@ -207,3 +248,6 @@ class HttpxClient:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
+
+
+http_client: HttpxClient = HttpxClient()